@@ -18,6 +18,12 @@ class Config:
     # Anthropic
     ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
     MODEL = "claude-haiku-4-5-20251001"
+    # Retries per Claude request on rate limits, overloads and 5xx (SDK backoff with jitter)
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+    # claude_only: Claude does everything. hybrid: a local Ollama model summarizes each
+    # newsletter and Claude only writes the cross-source sections. local_only: no Claude calls.
+    ROUTER_MODE = os.getenv("ROUTER_MODE", "claude_only")
+    LOCAL_MODEL = os.getenv("LOCAL_MODEL", "llama3.2:3b")
 
     # Notion
     NOTION_API_KEY = os.getenv("NOTION_API_KEY", "")
@@ -25,10 +31,27 @@ class Config:
 
     # Limits
     MAX_NEWSLETTERS = int(os.getenv("MAX_NEWSLETTERS", "30"))
+    # Cap individual newsletter at ~15K chars (~3.7K tokens)
+    MAX_BODY_CHARS = 15000
     # Max tokens to send per LLM call (~75K leaves room for response)
     MAX_INPUT_TOKENS = 75000
+    # Minimum output budget for calls that write a full digest (single call, chunks,
+    # synthesis, repair); it grows with the newsletter count since per_source has an entry each
+    DIGEST_MAX_TOKENS = int(os.getenv("DIGEST_MAX_TOKENS", "4096"))
+    # Output cap for the hybrid-mode Claude call, whose output (no per_source) is bounded
+    ROUTED_MAX_TOKENS = int(os.getenv("ROUTED_MAX_TOKENS", "2500"))
     # Approx chars per token for estimation
     CHARS_PER_TOKEN = 4
+    # Max concurrent LLM requests in chunked mode (keeps under per-minute rate limits)
+    MAX_CONCURRENCY = int(os.getenv("MAX_CONCURRENCY", "4"))
+    # Send chunked-mode extraction through the Message Batches API (half price, but results
+    # can take up to 24h) once a day needs at least BATCH_THRESHOLD chunks
+    USE_BATCH_API = os.getenv("USE_BATCH_API", "false").lower() in ("1", "true", "yes")
+    BATCH_THRESHOLD = int(os.getenv("BATCH_THRESHOLD", "2"))
+    # Seconds to reuse a cached LLM response for identical prompts (0 disables the cache)
+    CACHE_TTL = int(os.getenv("CACHE_TTL", str(7 * 24 * 3600)))
+    # Extra LLM calls allowed to fix a malformed JSON response before falling back
+    MAX_REPAIR_ATTEMPTS = int(os.getenv("MAX_REPAIR_ATTEMPTS", "1"))
 
     # Logging
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -37,7 +60,9 @@ class Config:
     def validate(cls):
         """Validate all required config is present."""
         errors = []
-        if not cls.ANTHROPIC_API_KEY:
+        if cls.ROUTER_MODE not in ("claude_only", "hybrid", "local_only"):
+            errors.append(f"ROUTER_MODE must be claude_only, hybrid or local_only (got {cls.ROUTER_MODE!r})")
+        if not cls.ANTHROPIC_API_KEY and cls.ROUTER_MODE != "local_only":
             errors.append("ANTHROPIC_API_KEY not set")
         if not cls.NOTION_API_KEY:
             errors.append("NOTION_API_KEY not set")
@@ -2,21 +2,30 @@
 
 Efficiency strategy:
 - 1 API call to list message IDs matching label + date filter
-- 1 batch API call to fetch all message bodies
-- Local HTML→text conversion (zero API calls)
+- 1 batch API call per 50 messages, issued concurrently, fetching raw RFC 822
+  (MIME parsed locally by stdlib email)
+- Local HTML→text conversion (zero API calls); very large bodies parsed on a thread pool
 """
 
 import base64
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from email import policy
+from email.message import EmailMessage
+from email.parser import BytesParser
 from email.utils import parsedate_to_datetime
+from itertools import groupby
 from typing import Optional
 
-from bs4 import BeautifulSoup
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
+from google_auth_httplib2 import AuthorizedHttp
 from googleapiclient.discovery import build
+from googleapiclient.http import build_http
+from lxml import etree
 
 from config import Config
 
@@ -25,9 +34,40 @@ logger = logging.getLogger(__name__)
 # Read-only Gmail access
 SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
 
+# Gmail's recommended maximum number of requests per batch
+_BATCH_SIZE = 50
+
+# Partial response: the message ID and the single base64url-encoded RFC 822 blob
+_MESSAGE_FIELDS = "id,raw"
+
+_MIME_PARSER = BytesParser(policy=policy.default)
+
+# Headers copied onto each newsletter dict
+_WANTED_HEADERS = frozenset({"subject", "from", "date"})
+
+# HTML is encoded and fed to the parser in slices of this many chars, so an early stop
+# also skips encoding the rest of a huge body
+_FEED_CHUNK_CHARS = 64 * 1024
+
+# HTML bodies above this size are cleaned on a thread pool instead of inline
+_LARGE_HTML_CHARS = 200_000
+
+# Script, style, tracking pixels, and other non-content elements
+_SKIP_TAGS = frozenset({"script", "style", "img", "meta", "link", "noscript"})
+
+
+# Authenticated service, reused across calls while its credentials stay valid
+_service = None
+_creds = None
+
 
 def get_gmail_service():
-    """Authenticate and return Gmail API service. Reuses cached token."""
+    """Authenticate and return Gmail API service. Reuses cached service and token."""
+    global _service, _creds
+
+    if _service is not None and _creds.valid:
+        return _service
+
     creds = None
 
     if Config.GMAIL_TOKEN_PATH.exists():
@@ -46,83 +86,178 @@ def get_gmail_service():
         Config.GMAIL_TOKEN_PATH.write_text(creds.to_json())
         logger.info(f"Token saved to {Config.GMAIL_TOKEN_PATH}")
 
-    return build("gmail", "v1", credentials=creds)
+    # Use the discovery doc bundled with the client library — no HTTP roundtrip
+    _service = build("gmail", "v1", credentials=creds, cache_discovery=False, static_discovery=True)
+    _creds = creds
+    return _service
 
 
-def _html_to_text(html: str) -> str:
-    """Convert HTML email body to clean plain text. Zero API calls."""
-    soup = BeautifulSoup(html, "lxml")
+def _new_http() -> AuthorizedHttp:
+    """Fresh authorized transport for one thread — httplib2 connections are not thread-safe."""
+    return AuthorizedHttp(_creds, http=build_http())
 
-    # Remove script, style, and tracking elements
-    for tag in soup(["script", "style", "img", "meta", "link", "noscript"]):
-        tag.decompose()
 
-    # Remove tracking pixels and tiny images
-    for img in soup.find_all("img"):
-        img.decompose()
+class _TextLimitReached(Exception):
+    """Raised by _TextCollector to abort parsing once enough text is buffered."""
 
-    # Get text with reasonable whitespace
-    text = soup.get_text(separator="\n", strip=True)
 
-    # Clean up excessive whitespace
-    lines = [line.strip() for line in text.splitlines()]
-    lines = [line for line in lines if line]  # Remove empty lines
-
-    # Deduplicate consecutive identical lines (common in newsletters)
-    deduped = []
-    for line in lines:
-        if not deduped or line != deduped[-1]:
-            deduped.append(line)
-
-    return "\n".join(deduped)
-
-
-def _extract_body(payload: dict) -> str:
-    """Recursively extract text/html or text/plain from email payload."""
-    mime_type = payload.get("mimeType", "")
-    body_data = payload.get("body", {}).get("data", "")
+class _TextCollector:
+    """
+    lxml parser target that keeps only visible text.
 
-    # Direct body
-    if body_data and mime_type in ("text/html", "text/plain"):
-        decoded = base64.urlsafe_b64decode(body_data).decode("utf-8", errors="replace")
-        if mime_type == "text/html":
-            return _html_to_text(decoded)
-        return decoded
+    Receives SAX-style events instead of building a DOM, so working memory stays
+    flat no matter how bloated the marketing HTML is. Stops the parse as soon as
+    more than max_chars of visible text has been seen.
+    """
 
-    # Multipart — prefer HTML over plain text
-    parts = payload.get("parts", [])
-    html_body = ""
-    plain_body = ""
+    def __init__(self):
+        self.reset(Config.MAX_BODY_CHARS)
+
+    def reset(self, max_chars: int):
+        """Clear state before parsing the next document."""
+        self.parts = []
+        self.skip_depth = 0
+        self.max_chars = max_chars
+        self.total_chars = 0
+
+    def start(self, tag, attrib):
+        if tag in _SKIP_TAGS:
+            self.skip_depth += 1
+        self.parts.append("\n")
+
+    def end(self, tag):
+        if tag in _SKIP_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+        self.parts.append("\n")
+
+    def data(self, data):
+        if not self.skip_depth:
+            self.parts.append(data)
+            self.total_chars += len(data.strip())
+            if self.total_chars > self.max_chars:
+                raise _TextLimitReached
+
+    def close(self):
+        return "".join(self.parts)
+
+
+# lxml parsers are not thread-safe, so each thread builds its own once
+_parser_local = threading.local()
+
+
+def _get_parser() -> tuple[etree.HTMLParser, _TextCollector]:
+    """Return this thread's reusable HTML parser and its text-collecting target."""
+    if not hasattr(_parser_local, "parser"):
+        _parser_local.collector = _TextCollector()
+        _parser_local.parser = etree.HTMLParser(
+            target=_parser_local.collector,
+            remove_blank_text=True,
+            remove_comments=True,
+            encoding="utf-8",
+        )
+    return _parser_local.parser, _parser_local.collector
 
-    for part in parts:
-        part_mime = part.get("mimeType", "")
-        part_data = part.get("body", {}).get("data", "")
 
-        if part_mime == "text/html" and part_data:
-            decoded = base64.urlsafe_b64decode(part_data).decode("utf-8", errors="replace")
-            html_body = _html_to_text(decoded)
-        elif part_mime == "text/plain" and part_data:
-            plain_body = base64.urlsafe_b64decode(part_data).decode("utf-8", errors="replace")
-        elif part_mime.startswith("multipart/"):
-            # Recurse into nested multipart
-            nested = _extract_body(part)
-            if nested:
-                html_body = html_body or nested
+def _feed_slices(html: str):
+    """
+    Yield html as UTF-8 slices of about _FEED_CHUNK_CHARS for incremental parsing.
 
-    return html_body or plain_body
+    Each cut is placed just before a "<" so no tag straddles two feeds — libxml2's push
+    parser misses a </script> or </style> split across feeds and swallows the rest.
+    """
+    start = 0
+    while start < len(html):
+        end = start + _FEED_CHUNK_CHARS
+        if end < len(html):
+            cut = html.rfind("<", start + 1, end)
+            if cut != -1:
+                end = cut
+        yield html[start:end].encode("utf-8", "replace")
+        start = end
+
+
+def _html_to_text(html: str, max_chars: int = Config.MAX_BODY_CHARS) -> str:
+    """Convert HTML email body to clean plain text, capped at max_chars. Zero API calls."""
+    if not html:
+        return ""
+
+    parser, collector = _get_parser()
+    collector.reset(max_chars)
+    try:
+        for chunk in _feed_slices(html):
+            parser.feed(chunk)
+        parser.close()
+    except _TextLimitReached:
+        # Everything past the cap would be sliced off anyway — skip parsing it,
+        # but close out the aborted document so the parser can be reused
+        try:
+            parser.close()
+        except etree.XMLSyntaxError:
+            pass
+
+    # Tag boundaries become newlines, matching get_text(separator="\n")
+    text = collector.close()
+
+    # Strip lines, drop empties, and collapse consecutive duplicates (common in newsletters)
+    # in a single lazy pass
+    lines = filter(None, (line.strip() for line in text.splitlines()))
+    return "\n".join(line for line, _ in groupby(lines))[:max_chars]
+
+
+def _part_text(part: EmailMessage) -> str:
+    """Decode a text MIME part, tolerating unknown charsets."""
+    try:
+        return part.get_content()
+    except LookupError:
+        return part.get_payload(decode=True).decode("utf-8", errors="replace")
 
 
-def _get_header(headers: list, name: str) -> str:
-    """Extract a header value by name."""
-    for h in headers:
-        if h["name"].lower() == name.lower():
-            return h["value"]
-    return ""
+def _extract_body(msg: EmailMessage) -> tuple[str, str]:
+    """
+    Extract the raw text/html or text/plain body from a parsed email.
 
+    Pure (no HTML parsing, no I/O) so the HTML cleanup can run after the batch completes.
 
-def _parse_date(headers: list) -> Optional[str]:
-    """Parse the Date header into ISO format."""
-    date_str = _get_header(headers, "Date")
+    Returns:
+        (content, mime_type) — mime_type is "text/html", "text/plain", or "" if no body
+    """
+    # Iterative depth-first walk in document order. Prefer HTML over plain text and stop
+    # at the first HTML part; attachments and forwarded messages are never picked.
+    plain_part = None
+    stack = [msg]
+
+    while stack:
+        part = stack.pop()
+        maintype = part.get_content_maintype()
+
+        if maintype == "multipart":
+            stack.extend(reversed(list(part.iter_parts())))
+        elif maintype == "text" and not part.is_attachment():
+            subtype = part.get_content_subtype()
+            if subtype == "html":
+                return _part_text(part), "text/html"
+            if subtype == "plain" and plain_part is None:
+                plain_part = part
+
+    if plain_part is None:
+        return "", ""
+    return _part_text(plain_part), "text/plain"
+
+
+def _read_headers(msg: EmailMessage) -> dict[str, str]:
+    """Decode the wanted headers in one pass, keyed by lowercase name (first occurrence wins)."""
+    headers = {}
+    for name, value in msg.raw_items():
+        key = name.lower()
+        if key in _WANTED_HEADERS and key not in headers:
+            headers[key] = str(msg.policy.header_fetch_parse(name, value))
+            if len(headers) == len(_WANTED_HEADERS):
+                break  # Skip the remaining (often dozens of) Received/DKIM/etc. headers
+    return headers
+
+
+def _parse_date(date_str: str) -> Optional[str]:
+    """Parse a Date header value into ISO format."""
     if not date_str:
         return None
     try:
@@ -132,6 +267,34 @@ def _parse_date(headers: list) -> Optional[str]:
         return None
 
 
+def _bodies_to_text(extracted: list[tuple[str, str]]) -> list[str]:
+    """
+    Convert (content, mime_type) pairs to plain text, in order.
+
+    Typical newsletters parse in a few ms, so they run inline. Very large bodies go to a
+    thread pool: lxml releases the GIL while tokenizing, and threads share the strings
+    rather than pickling them to worker processes.
+    """
+    bodies = [content for content, _ in extracted]
+    large_indices = []
+
+    for i, (content, mime_type) in enumerate(extracted):
+        if mime_type != "text/html":
+            continue
+        if len(content) > _LARGE_HTML_CHARS:
+            large_indices.append(i)
+        else:
+            bodies[i] = _html_to_text(content)
+
+    if large_indices:
+        with ThreadPoolExecutor(max_workers=min(4, len(large_indices))) as executor:
+            texts = executor.map(_html_to_text, [bodies[i] for i in large_indices])
+            for i, text in zip(large_indices, texts):
+                bodies[i] = text
+
+    return bodies
+
+
 def fetch_newsletters(date: Optional[datetime] = None) -> list[dict]:
     """
     Fetch newsletters from Gmail for a given date.
@@ -180,53 +343,87 @@ def fetch_newsletters(date: Optional[datetime] = None) -> list[dict]:
     logger.info(f"Found {len(message_ids)} newsletters. Fetching bodies...")
 
     # --- API Call 2: Batch fetch message bodies ---
-    # Use batch API for efficiency (single HTTP request, up to 100 messages)
-    newsletters = []
+    # Use batch API for efficiency (one HTTP request per 50 messages, run concurrently).
+    # The callback only stashes raw bodies; HTML cleanup happens afterwards in parallel.
+    raw_messages = []
 
     def _callback(request_id, response, exception):
         if exception:
             logger.warning(f"Failed to fetch message {request_id}: {exception}")
             return
 
-        headers = response.get("payload", {}).get("headers", [])
-        subject = _get_header(headers, "Subject")
-        sender = _get_header(headers, "From")
-        date_iso = _parse_date(headers)
-        body = _extract_body(response.get("payload", {}))
-
-        if not body or len(body.strip()) < 50:
-            logger.warning(f"Skipping empty/tiny newsletter: {subject}")
-            return
-
-        newsletters.append({
-            "subject": subject,
-            "sender": sender,
-            "date": date_iso,
-            "body": body[:15000],  # Cap individual newsletter at ~15K chars (~3.7K tokens)
-            "message_id": response["id"],
-        })
-
-    batch = service.new_batch_http_request(callback=_callback)
-    for msg_id in message_ids[:Config.MAX_NEWSLETTERS]:
-        batch.add(
-            service.users().messages().get(
-                userId="me",
-                id=msg_id,
-                format="full",
+        # Headers only; bodies are MIME-parsed after dedup so skipped duplicates cost nothing
+        raw = base64.urlsafe_b64decode(response["raw"])
+        headers = _read_headers(_MIME_PARSER.parsebytes(raw, headersonly=True))
+        raw_messages.append((headers, raw, response["id"]))
+
+    # IDs double as batch request_ids, which must be unique
+    message_ids = list(dict.fromkeys(message_ids))[:Config.MAX_NEWSLETTERS]
+    batches = []
+    for start in range(0, len(message_ids), _BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=_callback)
+        for msg_id in message_ids[start:start + _BATCH_SIZE]:
+            batch.add(
+                service.users().messages().get(
+                    userId="me",
+                    id=msg_id,
+                    format="raw",
+                    fields=_MESSAGE_FIELDS,
+                ),
+                request_id=msg_id,
             )
+        batches.append(batch)
+
+    if len(batches) == 1:
+        batches[0].execute()
+    else:
+        with ThreadPoolExecutor(max_workers=len(batches)) as executor:
+            list(executor.map(lambda b: b.execute(http=_new_http()), batches))
+
+    # Concurrent batches call back in any order — restore Gmail's listing order, which
+    # decides the surviving copy of a duplicate subject
+    position = {msg_id: i for i, msg_id in enumerate(message_ids)}
+    raw_messages.sort(key=lambda m: position[m[2]])
+
+    # Deduplicate by subject (some senders double-send): the first copy in listing order
+    # with a non-empty/tiny body wins. Only the first copy of each subject is parsed up
+    # front; a later copy is parsed only if every earlier one was rejected.
+    copies = {}
+    for position, (headers, raw, message_id) in enumerate(raw_messages):
+        copies.setdefault(headers.get("subject", "").lower().strip(), []).append(
+            (position, headers, raw, message_id)
         )
-    batch.execute()
 
-    logger.info(f"Successfully fetched {len(newsletters)} newsletters.")
+    kept = []  # (position, headers, body, message_id)
+    candidates = [(key, 0) for key in copies]
+    while candidates:
+        bodies = _bodies_to_text([
+            _extract_body(_MIME_PARSER.parsebytes(copies[key][index][2])) for key, index in candidates
+        ])
+
+        retry = []
+        for (key, index), body in zip(candidates, bodies):
+            position, headers, _, message_id = copies[key][index]
+            if not body or len(body.strip()) < 50:
+                logger.warning(f"Skipping empty/tiny newsletter: {headers.get('subject', '')}")
+                if index + 1 < len(copies[key]):
+                    retry.append((key, index + 1))
+                continue
+
+            kept.append((position, headers, body, message_id))
+            for _ in copies[key][index + 1:]:
+                logger.info(f"Skipping duplicate newsletter: {headers.get('subject', '')}")
+        candidates = retry
 
-    # Deduplicate by subject (some senders double-send)
-    seen_subjects = set()
-    unique = []
-    for nl in newsletters:
-        key = nl["subject"].lower().strip()
-        if key not in seen_subjects:
-            seen_subjects.add(key)
-            unique.append(nl)
+    newsletters = []
+    for _, headers, body, message_id in sorted(kept, key=lambda item: item[0]):
+        newsletters.append({
+            "subject": headers.get("subject", ""),
+            "sender": headers.get("from", ""),
+            "date": _parse_date(headers.get("date", "")),
+            "body": body[:Config.MAX_BODY_CHARS],  # No-op for HTML, which is capped while parsing
+            "message_id": message_id,
+        })
 
-    logger.info(f"After dedup: {len(unique)} unique newsletters.")
-    return unique
+    logger.info(f"Successfully fetched {len(newsletters)} unique newsletters.")
+    return newsletters
@@ -0,0 +1,75 @@
+"""On-disk cache of LLM responses, so re-running a day's digest doesn't re-pay for it."""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+CACHE_PATH = Path.home() / ".cache" / "newsletter-digest" / "llm.db"
+
+_conn = None
+_lock = threading.Lock()
+
+
+def cache_key(model: str, system_blocks: list[dict], user_text: str, max_tokens: int) -> str:
+    """
+    Hash everything that determines a response.
+
+    Keys are sorted at every level so dict ordering never causes a miss.
+    """
+    payload = json.dumps(
+        {"m": model, "s": system_blocks, "u": user_text, "mt": max_tokens},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _get_conn() -> sqlite3.Connection:
+    """Open (and create if needed) the cache database once per process."""
+    global _conn
+    if _conn is None:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        _conn = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, response TEXT, created_at INTEGER)"
+        )
+        _conn.commit()
+    return _conn
+
+
+def get(key: str) -> Optional[str]:
+    """Return the cached response for key, or None if missing, expired, or caching is off."""
+    if Config.CACHE_TTL <= 0:
+        return None
+    with _lock:
+        row = _get_conn().execute(
+            "SELECT response FROM responses WHERE key = ? AND created_at >= ?",
+            (key, int(time.time()) - Config.CACHE_TTL),
+        ).fetchone()
+    if row:
+        logger.info(f"LLM cache hit: {key[:12]}")
+        return row[0]
+    return None
+
+
+def set(key: str, response: str) -> None:
+    """Store a response, replacing any earlier entry for the same key."""
+    if Config.CACHE_TTL <= 0:
+        return
+    with _lock:
+        conn = _get_conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO responses (key, response, created_at) VALUES (?, ?, ?)",
+            (key, response, int(time.time())),
+        )
+        conn.commit()
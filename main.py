@@ -13,12 +13,13 @@ Usage:
 """
 
 import argparse
-import json
 import logging
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 
+import orjson
+
 from config import Config
 from gmail_fetcher import fetch_newsletters
 from summarizer import summarize_newsletters
@@ -69,7 +70,7 @@ def run(target_date: datetime, dry_run: bool = False):
     if dry_run:
         # Save to local file instead of Notion
         output_path = Path(__file__).parent / f"digest_{date_str}.json"
-        output_path.write_text(json.dumps(digest, indent=2))
+        output_path.write_bytes(orjson.dumps(digest, option=orjson.OPT_INDENT_2))
         logger.info(f"[DRY RUN] Digest saved to {output_path}")
         print(f"\n📋 Executive Summary:\n{digest.get('executive_summary', 'N/A')}")
         return
@@ -1,20 +1,62 @@
 """Notion API integration for publishing daily digests.
 
 Creates a single page per day in the Newsletter Digests database.
-Uses the official notion-client SDK for a single API call.
+Posts the pre-built page payload straight to the REST API over HTTP/2 in a
+single call; the official notion-client SDK is kept as a fallback.
+Multi-day backfills publish concurrently within Notion's rate limit.
 """
 
-import json
+import asyncio
 import logging
 from datetime import datetime
+from typing import Optional
 
+import httpx
 from notion_client import Client
 
 from config import Config
 
 logger = logging.getLogger(__name__)
 
-notion = Client(auth=Config.NOTION_API_KEY)
+NOTION_API_URL = "https://api.notion.com/v1/"
+NOTION_VERSION = "2022-06-28"
+# Notion allows an average of 3 requests per second per integration
+NOTION_REQUESTS_PER_SECOND = 3
+
+# Clients are created on first publish so importing this module (e.g. on --dry-run)
+# opens no connections
+_notion = None
+_http = None
+
+
+def _get_notion() -> Client:
+    """Return the notion-client SDK instance, creating it on first use."""
+    global _notion
+    if _notion is None:
+        _notion = Client(auth=Config.NOTION_API_KEY)
+    return _notion
+
+
+def _client_options() -> dict:
+    """Connection settings shared by the sync and async direct-API clients."""
+    return {
+        "base_url": NOTION_API_URL,
+        "http2": True,
+        "headers": {
+            "Authorization": f"Bearer {Config.NOTION_API_KEY}",
+            "Notion-Version": NOTION_VERSION,
+            "Content-Type": "application/json",
+        },
+        "timeout": 60.0,
+    }
+
+
+def _get_http() -> httpx.Client:
+    """Return the HTTP/2 client for direct API calls, creating it on first use."""
+    global _http
+    if _http is None:
+        _http = httpx.Client(**_client_options())
+    return _http
 
 
 def _build_rich_text(text: str) -> dict:
@@ -84,73 +126,73 @@ def _build_divider() -> dict:
     return {"object": "block", "type": "divider", "divider": {}}
 
 
+# Static blocks, built once — the same dict can appear in a payload any number of times
+_DIVIDER = _build_divider()
+_EXEC_SUMMARY_H2 = _build_heading("Executive Summary", 2)
+_SPECTER_H2 = _build_heading("🎯 Specter-Relevant", 2)
+_CATEGORIES_H2 = _build_heading("Categorized Insights", 2)
+_SOURCE_DETAILS_H2 = _build_heading("Source Details", 2)
+_NO_DETAILS = _build_paragraph("No details extracted.")
+_TRUNCATED_NOTICE = _build_paragraph("⚠️ Content truncated due to Notion block limit.")
+
+CATEGORY_EMOJIS = {
+    "AI & ML": "🤖",
+    "Funding & Deals": "💰",
+    "Market Trends": "📈",
+    "Legal Tech": "⚖️",
+    "Product Launches": "🚀",
+    "Policy & Regulation": "📜",
+    "Specter-Relevant": "🎯",
+}
+
+
 def _build_page_content(digest: dict) -> list[dict]:
     """Convert digest dict into Notion block children."""
-    blocks = []
-
     # --- Executive Summary ---
-    blocks.append(_build_heading("Executive Summary", 2))
-    blocks.append(_build_callout(digest.get("executive_summary", "No summary available."), "📋"))
-    blocks.append(_build_divider())
+    blocks = [
+        _EXEC_SUMMARY_H2,
+        _build_callout(digest.get("executive_summary", "No summary available."), "📋"),
+        _DIVIDER,
+    ]
 
     # --- Specter-Relevant (if any) ---
     specter_items = digest.get("specter_relevant", [])
     if specter_items:
-        blocks.append(_build_heading("🎯 Specter-Relevant", 2))
-        for item in specter_items:
-            blocks.append(_build_callout(item, "⚡"))
-        blocks.append(_build_divider())
+        blocks.append(_SPECTER_H2)
+        blocks.extend(_build_callout(item, "⚡") for item in specter_items)
+        blocks.append(_DIVIDER)
 
     # --- Categorized Insights ---
     categories = digest.get("categories", {})
     if categories:
-        blocks.append(_build_heading("Categorized Insights", 2))
+        blocks.append(_CATEGORIES_H2)
         for category, insights in categories.items():
             if not insights:
                 continue
 
             # Category as H3
-            emoji_map = {
-                "AI & ML": "🤖",
-                "Funding & Deals": "💰",
-                "Market Trends": "📈",
-                "Legal Tech": "⚖️",
-                "Product Launches": "🚀",
-                "Policy & Regulation": "📜",
-                "Specter-Relevant": "🎯",
-            }
-            emoji = emoji_map.get(category, "📌")
+            emoji = CATEGORY_EMOJIS.get(category, "📌")
             blocks.append(_build_heading(f"{emoji} {category}", 3))
+            blocks.extend(_build_bulleted_item(insight) for insight in insights)
 
-            for insight in insights:
-                blocks.append(_build_bulleted_item(insight))
-
-        blocks.append(_build_divider())
+        blocks.append(_DIVIDER)
 
     # --- Per-Source Summaries (in toggles for clean UX) ---
     per_source = digest.get("per_source", [])
     if per_source:
-        blocks.append(_build_heading("Source Details", 2))
+        blocks.append(_SOURCE_DETAILS_H2)
 
         for source in per_source:
             source_name = source.get("source", "Unknown")
             summary = source.get("summary", "")
-            key_facts = source.get("key_facts", [])
-            links = source.get("links", [])
 
             # Build toggle children
-            toggle_children = []
-            if summary:
-                toggle_children.append(_build_paragraph(summary))
-            if key_facts:
-                for fact in key_facts:
-                    toggle_children.append(_build_bulleted_item(f"📌 {fact}"))
-            if links:
-                for link in links:
-                    toggle_children.append(_build_bulleted_item(f"🔗 {link}"))
+            toggle_children = [_build_paragraph(summary)] if summary else []
+            toggle_children.extend(_build_bulleted_item(f"📌 {fact}") for fact in source.get("key_facts", []))
+            toggle_children.extend(_build_bulleted_item(f"🔗 {link}") for link in source.get("links", []))
 
             if not toggle_children:
-                toggle_children.append(_build_paragraph("No details extracted."))
+                toggle_children.append(_NO_DETAILS)
 
             blocks.append(_build_toggle(f"📰 {source_name}", toggle_children))
 
@@ -158,22 +200,36 @@ def _build_page_content(digest: dict) -> list[dict]:
     if len(blocks) > 100:
         logger.warning(f"Truncating blocks from {len(blocks)} to 100 (Notion limit)")
         blocks = blocks[:99]
-        blocks.append(_build_paragraph("⚠️ Content truncated due to Notion block limit."))
+        blocks.append(_TRUNCATED_NOTICE)
 
     return blocks
 
 
-def publish_digest(digest: dict, date: datetime, newsletter_count: int) -> str:
+def _create_page(payload: dict) -> dict:
     """
-    Publish digest to Notion database.
+    Create a page by POSTing the payload directly, skipping the SDK's re-serialization.
 
-    Args:
-        digest: Structured digest from summarizer
-        date: Date of the digest
-        newsletter_count: Number of newsletters processed
+    Falls back to the notion-client SDK only when no connection could be made,
+    so a page is never created twice.
+    """
+    try:
+        response = _get_http().post("pages", json=payload)
+    except httpx.ConnectError as e:
+        logger.warning(f"Direct Notion request could not connect ({e}); retrying via SDK")
+        return _get_notion().pages.create(**payload)
+
+    if response.is_error:
+        logger.error(f"Notion API error {response.status_code}: {response.text[:500]}")
+    response.raise_for_status()
+    return response.json()
+
+
+def _build_page_payload(digest: dict, date: datetime, newsletter_count: int) -> tuple[str, dict]:
+    """
+    Build the pages.create request body for a digest.
 
     Returns:
-        URL of the created Notion page
+        (page title, request payload)
     """
     date_str = date.strftime("%B %d, %Y")
     title = f"📬 Newsletter Digest — {date_str}"
@@ -192,7 +248,7 @@ def publish_digest(digest: dict, date: datetime, newsletter_count: int) -> str:
 
     # Determine status
     status = "Generated"
-    if digest.get("_parse_error"):
+    if digest.get("_parse_error") or digest.get("_skipped_newsletters"):
         status = "Partial"
     if not digest.get("executive_summary") or digest["executive_summary"].startswith("Failed"):
         status = "Failed"
@@ -200,22 +256,39 @@ def publish_digest(digest: dict, date: datetime, newsletter_count: int) -> str:
     # Build page content blocks
     children = _build_page_content(digest)
 
+    return title, {
+        "parent": {"database_id": Config.NOTION_DATABASE_ID},
+        "properties": {
+            "Title": {"title": [{"text": {"content": title}}]},
+            "Date": {"date": {"start": date.strftime("%Y-%m-%d")}},
+            "Newsletter Count": {"number": newsletter_count},
+            "Categories": {"multi_select": category_options},
+            "Status": {"select": {"name": status}},
+            "Sources": {"rich_text": [{"text": {"content": sources_text[:2000]}}]},
+        },
+        "children": children,
+    }
+
+
+def publish_digest(digest: dict, date: datetime, newsletter_count: int) -> str:
+    """
+    Publish digest to Notion database.
+
+    Args:
+        digest: Structured digest from summarizer
+        date: Date of the digest
+        newsletter_count: Number of newsletters processed
+
+    Returns:
+        URL of the created Notion page
+    """
+    title, payload = _build_page_payload(digest, date, newsletter_count)
+
     # --- Single API call: Create page with properties + content ---
     logger.info(f"Creating Notion page: {title}")
 
     try:
-        page = notion.pages.create(
-            parent={"database_id": Config.NOTION_DATABASE_ID},
-            properties={
-                "Title": {"title": [{"text": {"content": title}}]},
-                "Date": {"date": {"start": date.strftime("%Y-%m-%d")}},
-                "Newsletter Count": {"number": newsletter_count},
-                "Categories": {"multi_select": category_options},
-                "Status": {"select": {"name": status}},
-                "Sources": {"rich_text": [{"text": {"content": sources_text[:2000]}}]},
-            },
-            children=children,
-        )
+        page = _create_page(payload)
 
         page_url = page["url"]
         logger.info(f"✅ Notion page created: {page_url}")
@@ -224,3 +297,52 @@ def publish_digest(digest: dict, date: datetime, newsletter_count: int) -> str:
     except Exception as e:
         logger.error(f"Failed to create Notion page: {e}")
         raise
+
+
+async def publish_digests_async(items: list[tuple[dict, datetime, int]]) -> list[Optional[str]]:
+    """
+    Publish several digests concurrently (e.g. a multi-day backfill).
+
+    At most NOTION_REQUESTS_PER_SECOND requests are in flight, and each holds its slot
+    for at least one second, so the run stays within Notion's rate limit.
+
+    Args:
+        items: (digest, date, newsletter_count) tuples, as passed to publish_digest
+
+    Returns:
+        Page URLs in the same order as items; None where publishing failed
+    """
+    semaphore = asyncio.Semaphore(NOTION_REQUESTS_PER_SECOND)
+
+    async with httpx.AsyncClient(**_client_options()) as client:
+
+        async def _publish(digest: dict, date: datetime, newsletter_count: int) -> str:
+            title, payload = _build_page_payload(digest, date, newsletter_count)
+            async with semaphore:
+                logger.info(f"Creating Notion page: {title}")
+                response, _ = await asyncio.gather(
+                    client.post("pages", json=payload),
+                    asyncio.sleep(1),
+                )
+            if response.is_error:
+                logger.error(f"Notion API error {response.status_code}: {response.text[:500]}")
+            response.raise_for_status()
+            page_url = response.json()["url"]
+            logger.info(f"✅ Notion page created: {page_url}")
+            return page_url
+
+        results = await asyncio.gather(*(_publish(*item) for item in items), return_exceptions=True)
+
+    urls = []
+    for (_, date, _), result in zip(items, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to create Notion page for {date:%Y-%m-%d}: {result}")
+            urls.append(None)
+        else:
+            urls.append(result)
+    return urls
+
+
+def publish_digests(items: list[tuple[dict, datetime, int]]) -> list[Optional[str]]:
+    """Synchronous wrapper around publish_digests_async."""
+    return asyncio.run(publish_digests_async(items))
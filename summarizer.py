@@ -2,21 +2,80 @@
 
 Strategy for minimal API calls:
 - If total content fits in one context window: 1 API call (combined extract + synthesize)
-- If content is too large: batch into chunks → 1 call per chunk + 1 synthesis call
+- If content is too large: batch into chunks → 1 call per chunk (run concurrently) + 1 synthesis call
+  (optionally via the Message Batches API at half price when latency doesn't matter)
 - Typical day (10-15 newsletters): 1-2 API calls total
 """
 
+import asyncio
+import functools
+import hashlib
 import json
 import logging
+import re
+import time
 from datetime import datetime
+from typing import Callable, Optional
 
 import anthropic
+import httpx
 
+import llm_cache
 from config import Config
 
 logger = logging.getLogger(__name__)
 
-client = anthropic.Anthropic(api_key=Config.ANTHROPIC_API_KEY)
+LLM_TIMEOUT_SECONDS = 120
+
+
+def _http_client_options() -> dict:
+    """Shared httpx settings for the sync and async Anthropic clients."""
+    return {
+        # Concurrent chunk calls multiplex over one HTTP/2 connection instead of
+        # queueing behind HTTP/1.1's per-host connection limit
+        "http2": True,
+        "limits": httpx.Limits(max_connections=32, max_keepalive_connections=32),
+        "timeout": httpx.Timeout(LLM_TIMEOUT_SECONDS),
+    }
+
+
+# The SDK retries 408/409/429/5xx and connection errors with exponential backoff and
+# jitter, honouring Retry-After
+client = anthropic.Anthropic(
+    api_key=Config.ANTHROPIC_API_KEY,
+    max_retries=Config.LLM_MAX_RETRIES,
+    http_client=anthropic.DefaultHttpxClient(**_http_client_options()),
+)
+
+# Ollama's default context window (2048 tokens) would truncate most newsletter bodies
+LOCAL_NUM_CTX = 8192
+
+# Token budget for everything in a request besides the newsletter bodies
+PROMPT_OVERHEAD_TOKENS = 2000
+# Per-newsletter From/Subject/Date header block
+NEWSLETTER_OVERHEAD_TOKENS = 200
+
+# Full-digest output estimate: fixed sections plus one per_source entry per newsletter
+DIGEST_BASE_OUTPUT_TOKENS = 1500
+PER_SOURCE_OUTPUT_TOKENS = 250
+
+# Boilerplate footer lines: the phrase must open the line and the line must be short, so
+# sentences that merely mention unsubscribing or a copyright survive
+_FOOTER_RE = re.compile(
+    r"\s*[|•·–—-]?\s*(?:(?:click here )?to unsubscribe|unsubscribe"
+    r"|view (?:this email |it )?(?:online|in (?:your |a )?browser)"
+    r"|manage (?:your )?(?:preferences|subscription)|update your preferences"
+    r"|all rights reserved|©|\(c\) ?20\d\d|copyright ©?\s*20\d\d)",
+    re.IGNORECASE,
+)
+_FOOTER_MAX_LINE_CHARS = 80
+_URL_RE = re.compile(r"https?://\S+")
+_URL_TRAILING_CHARS = ")]>.,;:!?'\""
+_TRACKING_PARAM_RE = re.compile(r"(?<=[?&])(?:utm_\w+|mc_cid|mc_eid)=[^&#\s]*&?")
+
+# Message Batches polling: first wait, doubled each poll up to the max
+BATCH_POLL_INITIAL_SECONDS = 15
+BATCH_POLL_MAX_SECONDS = 300
 
 CATEGORIES = [
     "AI & ML",
@@ -28,10 +87,44 @@ CATEGORIES = [
     "Specter-Relevant",
 ]
 
-EXTRACTION_PROMPT = """You are a senior analyst creating a daily intelligence briefing from newsletters. 
-Today's date: {date}
+# --- Prompts ---
+# Everything that never changes between calls (instructions, categories, output schema)
+# lives in the system prompt; the date, count and newsletters go in the user message.
+# The system prompt carries a cache_control breakpoint, but at ~500 tokens (extraction)
+# and ~120 (synthesis) it is below Claude Haiku 4.5's minimum cacheable prompt length,
+# so the API does not cache it today and usage reports 0 cache reads. The breakpoint
+# only takes effect if the static prompt grows past that minimum. Same-day re-runs are
+# served by llm_cache instead.
 
-You will receive the full text of {count} newsletters. Your job:
+CATEGORIES_LIST = "\n".join(f"- {c}" for c in CATEGORIES)
+
+OUTPUT_SCHEMA_BLOCK = """Output format - respond with ONLY valid JSON (no markdown fences):
+{
+    "executive_summary": "...",
+    "categories": {
+        "AI & ML": ["insight 1 (Source: X)", "insight 2 (Source: Y)"],
+        "Funding & Deals": ["..."],
+        ...
+    },
+    "per_source": [
+        {
+            "source": "Newsletter Name",
+            "summary": "2-3 sentence summary",
+            "key_facts": ["fact 1", "fact 2"],
+            "links": ["url1", "url2"]
+        }
+    ],
+    "specter_relevant": ["specific item 1", "specific item 2"],
+    "active_categories": ["AI & ML", "Funding & Deals"]
+}
+
+Only include categories that have actual content. The "active_categories" array should list the category names that have insights.
+No trailing commentary. Minified JSON where whitespace isn't needed.
+"""
+
+EXTRACTION_SYSTEM = """You are a senior analyst creating a daily intelligence briefing from newsletters.
+
+You will receive the full text of a batch of newsletters. Your job:
 
 1. **Per-Newsletter Summary**: For each newsletter, extract:
    - Source (sender name)
@@ -40,8 +133,8 @@ You will receive the full text of {count} newsletters. Your job:
    - Any links or resources mentioned
 
 2. **Categorized Digest**: Group ALL insights across all newsletters into these categories:
-   {categories}
-   
+""" + CATEGORIES_LIST + """
+
    For each category that has relevant content:
    - Write 3-5 bullet points synthesizing across sources
    - Note which source(s) each insight came from
@@ -55,57 +148,169 @@ You will receive the full text of {count} newsletters. Your job:
    - Medical record processing, healthcare data
    - Funding rounds in legal tech or adjacent spaces
 
-Output format - respond with ONLY valid JSON (no markdown fences):
-{{
-    "executive_summary": "...",
-    "categories": {{
-        "AI & ML": ["insight 1 (Source: X)", "insight 2 (Source: Y)"],
-        "Funding & Deals": ["..."],
-        ...
-    }},
-    "per_source": [
-        {{
-            "source": "Newsletter Name",
-            "summary": "2-3 sentence summary",
-            "key_facts": ["fact 1", "fact 2"],
-            "links": ["url1", "url2"]
-        }}
-    ],
-    "specter_relevant": ["specific item 1", "specific item 2"],
-    "active_categories": ["AI & ML", "Funding & Deals"]
-}}
+""" + OUTPUT_SCHEMA_BLOCK
 
-Only include categories that have actual content. The "active_categories" array should list the category names that have insights.
+# Formatted once per run; only the newsletter tail changes from chunk to chunk
+EXTRACTION_USER_HEAD = """Today's date: {date}
 
----
+"""
 
-Here are today's newsletters:
+EXTRACTION_USER = """Here are today's {count} newsletters:
 
 {newsletters}
+
+Respond with compact JSON only.
 """
 
-CHUNK_SYNTHESIS_PROMPT = """You are combining multiple partial newsletter analyses into one final daily briefing.
-Today's date: {date}
+SYNTHESIS_SYSTEM = """You are combining multiple partial newsletter analyses into one final daily briefing.
 
-Below are partial analyses from different batches of newsletters. Merge them into a single coherent briefing.
+You will receive partial analyses from different batches of newsletters. Merge them into a single coherent briefing.
 
 Combine and deduplicate insights. Produce the same JSON format:
-{{
+{
     "executive_summary": "...",
-    "categories": {{...}},
+    "categories": {...},
     "per_source": [...],
     "specter_relevant": [...],
     "active_categories": [...]
-}}
+}
+
+No trailing commentary. Minified JSON where whitespace isn't needed.
+"""
+
+SYNTHESIS_USER = """Today's date: {date}
 
 Partial analyses:
 {chunks}
+
+Respond with compact JSON only.
 """
 
+REPAIR_SYSTEM = """You repair malformed or truncated JSON produced by a newsletter digest model.
+Keep every piece of content that is present, close anything left open, and drop only fragments that cannot be completed.
+
+""" + OUTPUT_SCHEMA_BLOCK
+
+REPAIR_USER = """The following JSON is truncated/malformed; return only valid JSON with the same schema:
+{text}
+"""
 
+# Two-tier routing (ROUTER_MODE hybrid/local_only): a local model summarizes each
+# newsletter, then one call over those short summaries writes the cross-source sections.
+
+LOCAL_EXTRACTION_SYSTEM = """You extract the key content of one newsletter for a daily intelligence briefing.
+
+Respond with ONLY valid JSON:
+{"source": "Newsletter Name", "summary": "2-3 sentence summary of the most important points", "key_facts": ["fact 1", "fact 2"], "links": ["url1", "url2"]}
+"""
+
+ROUTED_SYSTEM = """You are a senior analyst creating a daily intelligence briefing from per-newsletter summaries.
+
+You will receive a JSON list with one entry per newsletter (source, summary, key facts, links). Your job:
+
+1. **Categorized Digest**: Group ALL insights across all newsletters into these categories:
+""" + CATEGORIES_LIST + """
+
+   For each category that has relevant content:
+   - Write 3-5 bullet points synthesizing across sources
+   - Note which source(s) each insight came from
+   - Highlight anything time-sensitive or actionable
+
+2. **Executive Summary**: Write a 3-4 sentence overview of the most important things from today's newsletters. What should the reader pay attention to?
+
+3. **Specter-Relevant Flag**: Specifically flag anything related to:
+   - Legal technology, litigation tools, AI in law
+   - Mass tort / class action news
+   - Medical record processing, healthcare data
+   - Funding rounds in legal tech or adjacent spaces
+
+Output format - respond with ONLY valid JSON (no markdown fences):
+{
+    "executive_summary": "...",
+    "categories": {
+        "AI & ML": ["insight 1 (Source: X)", "insight 2 (Source: Y)"],
+        ...
+    },
+    "specter_relevant": ["specific item 1", "specific item 2"],
+    "active_categories": ["AI & ML", "Funding & Deals"]
+}
+
+Only include categories that have actual content. The "active_categories" array should list the category names that have insights.
+No trailing commentary. Minified JSON where whitespace isn't needed.
+"""
+
+ROUTED_USER = """Today's date: {date}
+
+Summaries of today's {count} newsletters:
+{summaries}
+
+Respond with compact JSON only.
+"""
+
+
+def _system_blocks(*texts: str) -> list[dict]:
+    """
+    Build system content blocks, each marked as a prompt-cache breakpoint.
+
+    Inactive while the block is shorter than the model's minimum cacheable length.
+    """
+    return [
+        {"type": "text", "text": text, "cache_control": {"type": "ephemeral"}}
+        for text in texts
+    ]
+
+
+def _digest_max_tokens(newsletter_count: int) -> int:
+    """
+    Output budget for a call that writes a full digest over newsletter_count newsletters.
+
+    A cap only ever truncates responses that need more, so it scales with per_source
+    instead of being trimmed to save cost.
+    """
+    return max(Config.DIGEST_MAX_TOKENS, DIGEST_BASE_OUTPUT_TOKENS + PER_SOURCE_OUTPUT_TOKENS * newsletter_count)
+
+
+def _cache_key(system_blocks: list[dict], user_text: str, max_tokens: int) -> str:
+    """Response-cache key for one request."""
+    return llm_cache.cache_key(Config.MODEL, system_blocks, user_text, max_tokens)
+
+
+EXTRACTION_SYSTEM_BLOCKS = _system_blocks(EXTRACTION_SYSTEM)
+SYNTHESIS_SYSTEM_BLOCKS = _system_blocks(SYNTHESIS_SYSTEM)
+REPAIR_SYSTEM_BLOCKS = _system_blocks(REPAIR_SYSTEM)
+ROUTED_SYSTEM_BLOCKS = _system_blocks(ROUTED_SYSTEM)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_encoding():
+    """
+    Load the local BPE tokenizer once; None if unavailable.
+
+    tiktoken downloads the encoding file on first use (then caches it), so the first run
+    needs network access; offline, counting falls back to CHARS_PER_TOKEN.
+    """
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"Tokenizer unavailable, falling back to ~{Config.CHARS_PER_TOKEN} chars/token: {e}")
+        return None
+
+
+@functools.lru_cache(maxsize=256)
 def _estimate_tokens(text: str) -> int:
-    """Rough token estimate: ~4 chars per token."""
-    return len(text) // Config.CHARS_PER_TOKEN
+    """
+    Approximate token count from a local BPE tokenizer, cached per text.
+
+    cl100k_base is OpenAI's encoding, not Claude's, and Claude's tokenizer usually
+    produces more tokens for the same text. This is only an estimate for sizing chunks;
+    the margin between MAX_INPUT_TOKENS and the model's context window absorbs the gap.
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // Config.CHARS_PER_TOKEN
+    return len(encoding.encode(text, disallowed_special=()))
 
 
 def _format_newsletters_block(newsletters: list[dict]) -> str:
@@ -123,52 +328,581 @@ def _format_newsletters_block(newsletters: list[dict]) -> str:
     return "\n\n".join(blocks)
 
 
-def _call_llm(prompt: str) -> str:
-    """Single LLM call with error handling."""
-    logger.info(f"LLM call: ~{_estimate_tokens(prompt)} input tokens")
-
-    response = client.messages.create(
-        model=Config.MODEL,
-        max_tokens=4096,
-        messages=[{"role": "user", "content": prompt}],
+def _log_usage(response) -> None:
+    """Log token usage, including prompt-cache reads/writes."""
+    usage = response.usage
+    logger.info(
+        f"LLM usage: {usage.input_tokens} input, "
+        f"{usage.output_tokens} output, "
+        f"{usage.cache_read_input_tokens or 0} cache read, "
+        f"{usage.cache_creation_input_tokens or 0} cache write"
     )
 
-    return response.content[0].text
+
+def _response_text(message) -> str:
+    """Join every text block of a message instead of assuming a single one."""
+    return "".join(block.text for block in message.content if block.type == "text")
 
 
-def _parse_json_response(text: str) -> dict:
-    """Parse JSON from LLM response, handling common issues."""
-    # Strip markdown fences if present
+def _strip_fences(text: str) -> str:
+    """Strip markdown fences if present."""
     cleaned = text.strip()
     if cleaned.startswith("```"):
         cleaned = cleaned.split("\n", 1)[1]  # Remove first line
         if cleaned.endswith("```"):
             cleaned = cleaned[:-3]
         cleaned = cleaned.strip()
+    return cleaned
 
+
+def _cache_response(key: str, stop_reason: Optional[str], text: str) -> None:
+    """
+    Cache a response only if it finished normally and is valid JSON.
+
+    A truncated or malformed digest must not be replayed on the re-run meant to fix it.
+    """
+    if stop_reason != "end_turn":
+        logger.info(f"Not caching response that stopped with {stop_reason}")
+        return
+    try:
+        json.loads(_strip_fences(text))
+    except json.JSONDecodeError:
+        logger.info("Not caching response that is not valid JSON")
+        return
+    llm_cache.set(key, text)
+
+
+class _TopLevelKeyScanner:
+    """
+    Incrementally scan a streamed JSON object and emit each top-level key once its value closes.
+
+    A key is only committed when the scanner is back at depth 1 (a "," or the final "}"
+    outside any string), so values are never handed out half-generated.
+    """
+
+    def __init__(self):
+        self._buf = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._entry_start = None
+
+    def feed(self, text: str) -> list[tuple[str, object]]:
+        """Consume a streamed fragment and return the (key, value) pairs it completed."""
+        completed = []
+        for ch in text:
+            self._buf.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._entry_start is None:
+                    self._entry_start = len(self._buf) - 1
+            elif ch in "{[":
+                if self._depth == 0:
+                    # Anything before the top-level object (e.g. a markdown fence) is ignored
+                    self._buf = ["{"]
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._commit(completed)
+            elif ch == "," and self._depth == 1:
+                self._commit(completed)
+        return completed
+
+    def _commit(self, completed: list) -> None:
+        """Parse the `"key": value` entry that just closed, if there is one."""
+        if self._entry_start is None:
+            return
+        entry = "".join(self._buf[self._entry_start:-1])
+        self._entry_start = None
+        try:
+            completed.extend(json.loads("{" + entry + "}").items())
+        except json.JSONDecodeError:
+            logger.debug(f"Skipping unparseable streamed entry: {entry[:100]}")
+
+
+def _call_llm(
+    system_blocks: list[dict],
+    user_text: str,
+    max_tokens: int,
+    on_section: Optional[Callable[[str, object], None]] = None,
+) -> str:
+    """
+    Single streamed LLM call with error handling.
+
+    Args:
+        system_blocks: Static system prompt blocks
+        user_text: Per-call user message
+        max_tokens: Output cap for this call type
+        on_section: Called with (key, value) as each top-level JSON key of the
+            response finishes streaming, before the rest of the response arrives
+
+    Returns:
+        Full response text
+    """
+    scanner = _TopLevelKeyScanner() if on_section else None
+    key = _cache_key(system_blocks, user_text, max_tokens)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        if scanner:
+            for section, value in scanner.feed(cached):
+                on_section(section, value)
+        return cached
+
+    prompt_text = "".join(block["text"] for block in system_blocks) + user_text
+    logger.info(f"LLM call: ~{_estimate_tokens(prompt_text)} input tokens")
+
+    parts = []
+    with client.messages.stream(
+        model=Config.MODEL,
+        max_tokens=max_tokens,
+        system=system_blocks,
+        messages=[{"role": "user", "content": user_text}],
+    ) as stream:
+        for text in stream.text_stream:
+            parts.append(text)
+            if scanner:
+                for section, value in scanner.feed(text):
+                    on_section(section, value)
+        response = stream.get_final_message()
+    _log_usage(response)
+
+    text = "".join(parts)
+    _cache_response(key, response.stop_reason, text)
+    return text
+
+
+async def _acall_llm(
+    aclient: anthropic.AsyncAnthropic,
+    system_blocks: list[dict],
+    user_text: str,
+    max_tokens: int,
+    semaphore: asyncio.Semaphore,
+) -> str:
+    """Async twin of _call_llm for extraction calls; the semaphore bounds concurrent requests."""
+    key = _cache_key(system_blocks, user_text, max_tokens)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        return cached
+
+    async with semaphore:
+        prompt_text = "".join(block["text"] for block in system_blocks) + user_text
+        logger.info(f"LLM call: ~{_estimate_tokens(prompt_text)} input tokens")
+
+        response = await aclient.messages.create(
+            model=Config.MODEL,
+            max_tokens=max_tokens,
+            system=system_blocks,
+            messages=[{"role": "user", "content": user_text}],
+        )
+        _log_usage(response)
+
+    text = _response_text(response)
+    _cache_response(key, response.stop_reason, text)
+    return text
+
+
+async def _extract_chunks(
+    system_blocks: list[dict], user_texts: list[str], max_tokens: int
+) -> list[Optional[str]]:
+    """
+    Run all chunk extraction prompts concurrently, in at most MAX_CONCURRENCY requests at once.
+
+    A chunk that still fails after the SDK's retries is skipped so synthesis can go ahead
+    on the rest.
+
+    Returns:
+        Response text per chunk, in chunk order; None for chunks that failed
+    """
+    semaphore = asyncio.Semaphore(Config.MAX_CONCURRENCY)
+    async with anthropic.AsyncAnthropic(
+        api_key=Config.ANTHROPIC_API_KEY,
+        max_retries=Config.LLM_MAX_RETRIES,
+        http_client=anthropic.DefaultAsyncHttpxClient(**_http_client_options()),
+    ) as aclient:
+        results = await asyncio.gather(
+            *(_acall_llm(aclient, system_blocks, user_text, max_tokens, semaphore) for user_text in user_texts),
+            return_exceptions=True,
+        )
+
+    texts = []
+    for i, result in enumerate(results, 1):
+        if isinstance(result, anthropic.APIError):
+            logger.warning(f"Chunk {i}/{len(results)} failed, skipping it: {result}")
+            texts.append(None)
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            texts.append(result)
+
+    if not any(texts):
+        raise RuntimeError("All chunk extraction calls failed")
+    return texts
+
+
+def _extract_chunks_batch(
+    system_blocks: list[dict], user_texts: list[str], max_tokens: int
+) -> list[Optional[str]]:
+    """
+    Run chunk extraction through the Message Batches API (50% of the regular price).
+
+    Blocks until the batch has ended — usually minutes, at most 24 hours.
+
+    Returns:
+        Response text per chunk, in chunk order; None for requests that did not succeed
+    """
+    keys = [_cache_key(system_blocks, user_text, max_tokens) for user_text in user_texts]
+    texts = {}
+    for i, key in enumerate(keys):
+        cached = llm_cache.get(key)
+        if cached is not None:
+            texts[f"chunk-{i}"] = cached
+
+    pending = [(i, user_text) for i, user_text in enumerate(user_texts) if f"chunk-{i}" not in texts]
+    if not pending:
+        return [texts[f"chunk-{i}"] for i in range(len(user_texts))]
+
+    batch = client.messages.batches.create(requests=[
+        {
+            "custom_id": f"chunk-{i}",
+            "params": {
+                "model": Config.MODEL,
+                "max_tokens": max_tokens,
+                "system": system_blocks,
+                "messages": [{"role": "user", "content": user_text}],
+            },
+        }
+        for i, user_text in pending
+    ])
+    logger.info(f"Submitted message batch {batch.id} with {len(pending)} requests")
+
+    delay = BATCH_POLL_INITIAL_SECONDS
+    while batch.processing_status != "ended":
+        time.sleep(delay)
+        delay = min(delay * 2, BATCH_POLL_MAX_SECONDS)
+        batch = client.messages.batches.retrieve(batch.id)
+        logger.info(f"Batch {batch.id}: {batch.request_counts.processing} requests still processing")
+
+    for entry in client.messages.batches.results(batch.id):
+        if entry.result.type == "succeeded":
+            _log_usage(entry.result.message)
+            texts[entry.custom_id] = _response_text(entry.result.message)
+            _cache_response(
+                keys[int(entry.custom_id.split("-")[1])],
+                entry.result.message.stop_reason,
+                texts[entry.custom_id],
+            )
+        else:
+            logger.warning(f"Batch request {entry.custom_id} did not succeed: {entry.result.type}")
+
+    if not texts:
+        raise RuntimeError(f"All requests in message batch {batch.id} failed")
+    return [texts.get(f"chunk-{i}") for i in range(len(user_texts))]
+
+
+def _strip_tracking(match: re.Match) -> str:
+    """Remove utm_* / Mailchimp tracking parameters from one URL."""
+    # \S+ also grabs closing brackets and sentence punctuation; set them aside so they
+    # survive when the last parameter is removed
+    url = match.group(0).rstrip(_URL_TRAILING_CHARS)
+    trailing = match.group(0)[len(url):]
+    stripped = _TRACKING_PARAM_RE.sub("", url)
+    if stripped != url:
+        url = re.sub(r"[?&]+(?=#|$)", "", stripped)
+    return url + trailing
+
+
+def _compress_body(text: str) -> str:
+    """
+    Strip filler that costs input tokens without adding content.
+
+    Drops short lines that open with unsubscribe / view-in-browser / copyright
+    boilerplate, removes tracking parameters from URLs and collapses runs of blank
+    lines and spaces.
+    """
+    lines = [
+        line for line in text.splitlines()
+        if len(line) > _FOOTER_MAX_LINE_CHARS or not _FOOTER_RE.match(line)
+    ]
+    text = _URL_RE.sub(_strip_tracking, "\n".join(lines))
+    text = re.sub(r"[ \t]{2,}", " ", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def _dedupe_newsletters(newsletters: list[dict]) -> list[dict]:
+    """
+    Drop newsletters whose body repeats an earlier one (double-sends, cross-posts).
+
+    Bodies are compared after collapsing whitespace and case, so reformatted repeats
+    match too. The kept newsletter lists every sender.
+    """
+    seen = {}
+    for nl in newsletters:
+        normalized = " ".join(nl["body"].lower().split())
+        digest = hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+        if digest not in seen:
+            seen[digest] = nl
+            continue
+        kept = seen[digest]
+        if nl["sender"] not in kept["sender"].split(", "):
+            seen[digest] = {**kept, "sender": f"{kept['sender']}, {nl['sender']}"}
+        logger.info(f"Skipping duplicate body: {nl['subject']} (same as {kept['subject']})")
+    return list(seen.values())
+
+
+def _get_ollama():
+    """Import the optional ollama client; None if it isn't installed."""
     try:
-        return json.loads(cleaned)
+        import ollama
+
+        return ollama
+    except ImportError:
+        logger.warning(f"ROUTER_MODE={Config.ROUTER_MODE} needs the ollama package (pip install ollama)")
+        return None
+
+
+def _local_errors(ollama) -> tuple[type[BaseException], ...]:
+    """
+    Failures of the local model server.
+
+    ollama 0.4 raises httpx errors when the server is down, newer releases turn them into
+    the builtin ConnectionError, and a model that was never pulled raises ResponseError.
+    """
+    return (ConnectionError, httpx.HTTPError, ollama.ResponseError)
+
+
+def _local_chat(ollama, system: str, user_text: str) -> str:
+    """Single call to the local model, constrained to JSON output."""
+    response = ollama.chat(
+        model=Config.LOCAL_MODEL,
+        messages=[{"role": "system", "content": system}, {"role": "user", "content": user_text}],
+        format="json",
+        options={"num_ctx": LOCAL_NUM_CTX},
+    )
+    return response["message"]["content"]
+
+
+def _as_str_list(value) -> list[str]:
+    """Coerce a local-model field to a list of strings (a bare string becomes one item)."""
+    if isinstance(value, str):
+        return [value] if value else []
+    if isinstance(value, list):
+        return [item for item in value if isinstance(item, str)]
+    return []
+
+
+async def _local_extract(aclient, nl: dict, semaphore: asyncio.Semaphore) -> dict:
+    """Build one newsletter's per_source entry with the local model."""
+    async with semaphore:
+        response = await aclient.chat(
+            model=Config.LOCAL_MODEL,
+            messages=[
+                {"role": "system", "content": LOCAL_EXTRACTION_SYSTEM},
+                {"role": "user", "content": _format_newsletters_block([nl])},
+            ],
+            format="json",
+            options={"num_ctx": LOCAL_NUM_CTX},
+        )
+
+    try:
+        entry = json.loads(response["message"]["content"])
+    except json.JSONDecodeError:
+        entry = None
+    if not isinstance(entry, dict):
+        logger.warning(f"Local model did not return a JSON object for: {nl['subject']}")
+        entry = {}
+    source = entry.get("source")
+    summary = entry.get("summary")
+    return {
+        "source": source if isinstance(source, str) and source else nl["sender"],
+        "summary": summary if isinstance(summary, str) else "",
+        "key_facts": _as_str_list(entry.get("key_facts")),
+        "links": _as_str_list(entry.get("links")),
+    }
+
+
+async def _local_extract_all(ollama, newsletters: list[dict]) -> tuple[list[dict], list[str]]:
+    """
+    Run per-newsletter local extraction concurrently, in newsletter order.
+
+    A newsletter the local model fails on is skipped; if every one fails the first error
+    is raised so hybrid mode can fall back to Claude.
+
+    Returns:
+        (per_source entries, subjects of skipped newsletters)
+    """
+    semaphore = asyncio.Semaphore(Config.MAX_CONCURRENCY)
+    aclient = ollama.AsyncClient()
+    results = await asyncio.gather(
+        *(_local_extract(aclient, nl, semaphore) for nl in newsletters),
+        return_exceptions=True,
+    )
+
+    per_source, skipped, errors = [], [], []
+    for nl, result in zip(newsletters, results):
+        if isinstance(result, _local_errors(ollama)):
+            logger.warning(f"Local extraction failed, skipping {nl['subject']}: {result}")
+            skipped.append(nl["subject"])
+            errors.append(result)
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            per_source.append(result)
+
+    if not per_source and errors:
+        raise errors[0]
+    return per_source, skipped
+
+
+def _summarize_routed(
+    ollama,
+    newsletters: list[dict],
+    date_str: str,
+    on_section: Optional[Callable[[str, object], None]],
+) -> dict:
+    """
+    Two-tier summary: the local model writes per_source, then a single call over those
+    summaries writes the categories and executive summary.
+
+    That call goes to Claude in hybrid mode and to the local model in local_only mode.
+    """
+    logger.info(f"Routed mode ({Config.ROUTER_MODE}): extracting {len(newsletters)} newsletters with {Config.LOCAL_MODEL}")
+    per_source, skipped = asyncio.run(_local_extract_all(ollama, newsletters))
+    if on_section:
+        on_section("per_source", per_source)
+
+    user_text = ROUTED_USER.format(
+        date=date_str,
+        count=len(per_source),
+        summaries=json.dumps(per_source, ensure_ascii=False),
+    )
+    if Config.ROUTER_MODE == "local_only":
+        # No Claude repair call either
+        digest = _parse_json_response(_local_chat(ollama, ROUTED_SYSTEM, user_text), repair_attempts=0)
+        if on_section:
+            for section, value in digest.items():
+                if not section.startswith("_"):
+                    on_section(section, value)
+    else:
+        digest = _parse_json_response(
+            _call_llm(ROUTED_SYSTEM_BLOCKS, user_text, Config.ROUTED_MAX_TOKENS, on_section),
+            required_keys=("categories",),
+        )
+
+    digest = {**digest, "per_source": per_source}
+    if skipped:
+        digest["_skipped_newsletters"] = skipped
+    return digest
+
+
+def _pack_chunks(newsletters: list[dict]) -> list[list[dict]]:
+    """
+    Split newsletters into as few prompt-sized chunks as possible (First-Fit-Decreasing).
+
+    A greedy forward pass often leaves an underfilled last chunk, which costs an extra
+    API call. Newsletters keep their original order within each chunk.
+    """
+    capacity = Config.MAX_INPUT_TOKENS - PROMPT_OVERHEAD_TOKENS
+    bins = []  # [remaining capacity, [(index, newsletter), ...]]
+
+    for i, nl in sorted(enumerate(newsletters), key=lambda item: item[1]["_tokens"], reverse=True):
+        for bin_ in bins:
+            if bin_[0] >= nl["_tokens"]:
+                bin_[0] -= nl["_tokens"]
+                bin_[1].append((i, nl))
+                break
+        else:
+            # An oversized newsletter still gets a chunk of its own
+            bins.append([capacity - nl["_tokens"], [(i, nl)]])
+
+    bins.sort(key=lambda bin_: min(i for i, _ in bin_[1]))
+    return [[nl for _, nl in sorted(items, key=lambda item: item[0])] for _, items in bins]
+
+
+def _parse_json_response(
+    text: str,
+    repair_attempts: Optional[int] = None,
+    required_keys: tuple[str, ...] = ("categories", "per_source"),
+) -> dict:
+    """
+    Parse JSON from LLM response, handling common issues.
+
+    Malformed output is recovered in two tiers: every top-level key that closed cleanly
+    is kept, and if any of required_keys is still missing the model gets up to
+    Config.MAX_REPAIR_ATTEMPTS calls to fix its own output. A repair is only used if
+    it supplies the missing keys, and it is merged over the recovered ones.
+    """
+    if repair_attempts is None:
+        repair_attempts = Config.MAX_REPAIR_ATTEMPTS
+
+    cleaned = _strip_fences(text)
+
+    try:
+        parsed = json.loads(cleaned)
+        if not isinstance(parsed, dict):
+            raise json.JSONDecodeError("Expected a JSON object", cleaned, 0)
+        return parsed
     except json.JSONDecodeError as e:
         logger.error(f"Failed to parse LLM JSON response: {e}")
         logger.debug(f"Raw response: {text[:500]}")
-        # Return a minimal valid structure
+
+        recovered = dict(_TopLevelKeyScanner().feed(cleaned))
+        if recovered:
+            logger.info(f"Recovered keys from malformed response: {', '.join(recovered)}")
+
+        missing = [key for key in required_keys if key not in recovered]
+        if missing and repair_attempts > 0:
+            logger.info(f"Asking the model to repair its JSON response (missing: {', '.join(missing)})...")
+            # The repair re-emits everything already written and then finishes it
+            repair_max_tokens = _estimate_tokens(cleaned) + Config.DIGEST_MAX_TOKENS
+            repaired = _parse_json_response(
+                _call_llm(REPAIR_SYSTEM_BLOCKS, REPAIR_USER.format(text=cleaned), repair_max_tokens),
+                repair_attempts - 1,
+                required_keys,
+            )
+            if "_parse_error" not in repaired and all(key in repaired for key in missing):
+                return {**recovered, **repaired}
+            logger.warning("Repair did not restore the missing keys, keeping what was recovered")
+
+        # Return a minimal valid structure, filled in with whatever was recovered
         return {
             "executive_summary": "Failed to parse newsletter digest. Check logs.",
             "categories": {},
             "per_source": [],
             "specter_relevant": [],
             "active_categories": [],
+            **recovered,
             "_parse_error": str(e),
             "_raw_response": text[:2000],
         }
 
 
-def summarize_newsletters(newsletters: list[dict], date: datetime) -> dict:
+def summarize_newsletters(
+    newsletters: list[dict],
+    date: datetime,
+    on_section: Optional[Callable[[str, object], None]] = None,
+) -> dict:
     """
     Summarize newsletters into a structured digest.
 
     Automatically batches if content exceeds context window limits.
 
+    Args:
+        newsletters: Newsletters from fetch_newsletters
+        date: Digest date
+        on_section: Optional hook called with (key, value) for each top-level digest
+            key as soon as it has streamed in, e.g. to start rendering
+            executive_summary before per_source finishes
+
     Returns:
         dict with keys: executive_summary, categories, per_source,
                        specter_relevant, active_categories
@@ -183,69 +917,87 @@ def summarize_newsletters(newsletters: list[dict], date: datetime) -> dict:
         }
 
     date_str = date.strftime("%B %d, %Y")
-    categories_str = "\n   ".join(f"- {c}" for c in CATEGORIES)
+    user_head = EXTRACTION_USER_HEAD.format(date=date_str)
 
-    # Check if everything fits in one call
-    all_content = _format_newsletters_block(newsletters)
-    total_tokens = _estimate_tokens(all_content) + 2000  # Prompt overhead
+    raw_tokens = sum(_estimate_tokens(nl["body"]) for nl in newsletters)
+    newsletters = [{**nl, "body": _compress_body(nl["body"])} for nl in newsletters]
+    newsletters = _dedupe_newsletters(newsletters)
+
+    # Count each body once; the fit check and chunking both reuse the cached count
+    for nl in newsletters:
+        nl["_tokens"] = _estimate_tokens(nl["body"]) + NEWSLETTER_OVERHEAD_TOKENS
 
-    if total_tokens <= Config.MAX_INPUT_TOKENS:
+    # Check if everything fits in one call
+    total_tokens = sum(nl["_tokens"] for nl in newsletters) + PROMPT_OVERHEAD_TOKENS
+    body_tokens = total_tokens - PROMPT_OVERHEAD_TOKENS - NEWSLETTER_OVERHEAD_TOKENS * len(newsletters)
+    logger.info(f"Compressed newsletter bodies: ~{raw_tokens} -> ~{body_tokens} tokens")
+
+    if Config.ROUTER_MODE != "claude_only":
+        ollama = _get_ollama()
+        if ollama is None and Config.ROUTER_MODE == "local_only":
+            raise RuntimeError("ROUTER_MODE=local_only requires the ollama package")
+        if ollama is not None:
+            try:
+                return _summarize_routed(ollama, newsletters, date_str, on_section)
+            except _local_errors(ollama) as e:
+                if Config.ROUTER_MODE == "local_only":
+                    raise
+                logger.warning(f"Local model unavailable ({e}), using Claude only")
+    # Packing can still yield one chunk (a single oversized newsletter), which the
+    # single-call prompt handles without a synthesis round trip
+    chunks = _pack_chunks(newsletters) if total_tokens > Config.MAX_INPUT_TOKENS else [newsletters]
+
+    if len(chunks) == 1:
         # === SINGLE CALL PATH (most common) ===
         logger.info(f"Single-call mode: {len(newsletters)} newsletters, ~{total_tokens} tokens")
 
-        prompt = EXTRACTION_PROMPT.format(
-            date=date_str,
-            count=len(newsletters),
-            categories=categories_str,
-            newsletters=all_content,
-        )
+        all_content = _format_newsletters_block(newsletters)
+        user_text = user_head + EXTRACTION_USER.format(count=len(newsletters), newsletters=all_content)
 
-        response_text = _call_llm(prompt)
+        response_text = _call_llm(
+            EXTRACTION_SYSTEM_BLOCKS, user_text, _digest_max_tokens(len(newsletters)), on_section
+        )
         return _parse_json_response(response_text)
 
     else:
         # === CHUNKED MODE (rare, 20+ newsletters) ===
         logger.info(f"Chunked mode: {len(newsletters)} newsletters, ~{total_tokens} tokens")
-
-        # Split newsletters into chunks that fit
-        chunks = []
-        current_chunk = []
-        current_tokens = 2000  # Prompt overhead
-
-        for nl in newsletters:
-            nl_tokens = _estimate_tokens(nl["body"]) + 200  # Header overhead
-            if current_tokens + nl_tokens > Config.MAX_INPUT_TOKENS and current_chunk:
-                chunks.append(current_chunk)
-                current_chunk = []
-                current_tokens = 2000
-
-            current_chunk.append(nl)
-            current_tokens += nl_tokens
-
-        if current_chunk:
-            chunks.append(current_chunk)
-
         logger.info(f"Split into {len(chunks)} chunks")
 
-        # Process each chunk
-        partial_results = []
+        # Process all chunks concurrently — wall-clock is the slowest chunk, not the sum
+        user_texts = []
         for i, chunk in enumerate(chunks):
-            logger.info(f"Processing chunk {i + 1}/{len(chunks)} ({len(chunk)} newsletters)")
+            logger.info(f"Preparing chunk {i + 1}/{len(chunks)} ({len(chunk)} newsletters)")
             chunk_content = _format_newsletters_block(chunk)
-            prompt = EXTRACTION_PROMPT.format(
-                date=date_str,
-                count=len(chunk),
-                categories=categories_str,
-                newsletters=chunk_content,
-            )
-            result_text = _call_llm(prompt)
-            partial_results.append(result_text)
+            user_texts.append(user_head + EXTRACTION_USER.format(count=len(chunk), newsletters=chunk_content))
+        chunk_max_tokens = _digest_max_tokens(max(len(chunk) for chunk in chunks))
+        if Config.USE_BATCH_API and len(chunks) > 1 and len(chunks) >= Config.BATCH_THRESHOLD:
+            partial_results = _extract_chunks_batch(EXTRACTION_SYSTEM_BLOCKS, user_texts, chunk_max_tokens)
+        else:
+            partial_results = asyncio.run(_extract_chunks(EXTRACTION_SYSTEM_BLOCKS, user_texts, chunk_max_tokens))
+
+        # Newsletters of failed chunks are missing from the digest; flag it so the page is
+        # published as Partial rather than Generated
+        skipped = [
+            nl["subject"]
+            for chunk, text in zip(chunks, partial_results) if text is None
+            for nl in chunk
+        ]
+        partial_results = [text for text in partial_results if text is not None]
+
+        if len(partial_results) == 1:
+            # Every other chunk failed; the survivor is already in digest format
+            digest = _parse_json_response(partial_results[0])
+            digest["_skipped_newsletters"] = skipped
+            return digest
 
         # Synthesize chunks into final digest
         logger.info("Synthesizing chunks into final digest...")
-        synthesis_prompt = CHUNK_SYNTHESIS_PROMPT.format(
-            date=date_str,
-            chunks="\n\n---\n\n".join(partial_results),
+        user_text = SYNTHESIS_USER.format(date=date_str, chunks="\n\n---\n\n".join(partial_results))
+        final_text = _call_llm(
+            SYNTHESIS_SYSTEM_BLOCKS, user_text, _digest_max_tokens(len(newsletters)), on_section
         )
-        final_text = _call_llm(synthesis_prompt)
-        return _parse_json_response(final_text)
+        digest = _parse_json_response(final_text)
+        if skipped:
+            digest["_skipped_newsletters"] = skipped
+        return digest